@@ -35,6 +35,7 @@ setuptools.setup(
     install_requires=[
         "appdirs>=1.4.0",
         "toml",
+        "tomli; python_version < '3.11'",
         "pyyaml",
         "psutil",
         "yadg==4.2.4",
@@ -1,22 +1,17 @@
 import sys
-import os
-import subprocess
-import textwrap
-from pathlib import Path
-from datetime import datetime, timezone
-from importlib import metadata
+import functools
+import importlib
 
 import argparse
 import logging
-import psutil
-import zmq
-import appdirs
-import yaml
-import toml
 
-sys.path += sys.modules["tomato"].__path__
+from tomato import _version
 
-from tomato import tomato, ketchup, _version
+
+def __getattr__(name: str):
+    if name in {"tomato", "ketchup"}:
+        return importlib.import_module(f"tomato.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __version__ = _version.get_versions()["version"]
@@ -25,13 +20,141 @@ DEFAULT_TOMATO_PORT = 1234
 logger = logging.getLogger(__name__)
 
 
+_loghandler = None
+
+
 def set_loglevel(loglevel: int):
-    logging.basicConfig(level=loglevel)
-    logger.debug("loglevel set to '%s'", logging._levelToName[loglevel])
+    global _loghandler
+    if _loghandler is None:
+        _loghandler = logging.StreamHandler()
+        _loghandler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        logger.addHandler(_loghandler)
+    _loghandler.setLevel(loglevel)
+    logger.setLevel(loglevel)
+    logger.debug("loglevel set to '%s'", logging.getLevelName(loglevel))
+
+
+def _dump(ret) -> str:
+    """Serialise a :class:`Reply` for printing, using libyaml when available."""
+    import yaml
+
+    try:
+        from yaml import CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeDumper as Dumper
+
+    return yaml.dump(ret.dict(), Dumper=Dumper)
+
+
+def get_context():
+    """Return the shared, lazily created :class:`zmq.Context` of this process."""
+    import zmq
+
+    return zmq.Context.instance()
+
+
+@functools.lru_cache(maxsize=1)
+def _appdirs():
+    import appdirs
+
+    return appdirs.AppDirs("tomato", "dgbowl", version=VERSION)
+
+
+def _add_tomato_opts(p: argparse.ArgumentParser, config_dir: str, data_dir: str):
+    p.add_argument(
+        "--port",
+        "-p",
+        help="Port number of tomato's reply socket",
+        default=DEFAULT_TOMATO_PORT,
+    )
+    p.add_argument(
+        "--timeout",
+        help="Timeout for the tomato command, in milliseconds",
+        type=int,
+        default=3000,
+    )
+    p.add_argument(
+        "--appdir",
+        "-A",
+        help="Settings directory for tomato",
+        default=config_dir,
+    )
+    p.add_argument(
+        "--datadir",
+        "-D",
+        help="Data directory for tomato",
+        default=data_dir,
+    )
+    p.add_argument(
+        "--logdir",
+        "-L",
+        help="Log directory for tomato",
+        default=data_dir,
+    )
+
+
+def _add_ketchup_opts(p: argparse.ArgumentParser, config_dir: str, data_dir: str):
+    p.add_argument(
+        "--port",
+        "-p",
+        help="Port number of tomato's reply socket",
+        default=DEFAULT_TOMATO_PORT,
+    )
+    p.add_argument(
+        "--timeout",
+        help="Timeout for the ketchup command, in milliseconds",
+        type=int,
+        default=3000,
+    )
+    p.add_argument(
+        "--appdir",
+        help="Settings directory for tomato",
+        default=config_dir,
+    )
+    p.add_argument(
+        "--datadir",
+        help="Data directory for tomato",
+        default=data_dir,
+    )
+
+
+def _count_verbosity(args: argparse.Namespace, extras: list[str]):
+    """
+    Count stray ``-v``/``-q`` flags that were given after the subcommand and
+    therefore left in ``extras``, accumulating them onto ``args``.
+    """
+    for arg in extras:
+        if arg == "--verbose":
+            args.verbose += 1
+        elif arg == "--quiet":
+            args.quiet += 1
+        elif len(arg) > 1 and set(arg) == {"-", "v"}:
+            args.verbose += len(arg) - 1
+        elif len(arg) > 1 and set(arg) == {"-", "q"}:
+            args.quiet += len(arg) - 1
+
+
+def _sniff_subcommand(argv: list[str], choices: set[str]) -> str:
+    """
+    Find the subcommand selected in ``argv`` without invoking argparse.
+
+    Returns the first non-flag token if it matches one of ``choices``, else
+    returns ``None``, meaning all subparsers have to be constructed (e.g. for
+    ``-h``/``--help`` or an invalid subcommand).
+    """
+    for arg in argv:
+        if arg in {"-h", "--help"}:
+            return None
+        if arg.startswith("-"):
+            continue
+        return arg if arg in choices else None
+    return None
 
 
 def run_tomato():
-    dirs = appdirs.AppDirs("tomato", "dgbowl", version=VERSION)
+    from tomato import tomato
+
+    dirs = _appdirs()
     config_dir = dirs.user_config_dir
     data_dir = dirs.user_data_dir
     log_dir = dirs.user_log_dir
@@ -43,105 +166,103 @@ def run_tomato():
         version=f"%(prog)s version {VERSION}",
     )
 
-    verbose = argparse.ArgumentParser(add_help=False)
-
     subparsers = parser.add_subparsers(dest="subcommand", required=True)
 
-    status = subparsers.add_parser("status")
-    status.set_defaults(func=tomato.status)
-
-    start = subparsers.add_parser("start")
-    start.set_defaults(func=tomato.start)
-
-    stop = subparsers.add_parser("stop")
-    stop.set_defaults(func=tomato.stop)
-
-    init = subparsers.add_parser("init")
-    init.set_defaults(func=tomato.init)
-
-    reload = subparsers.add_parser("reload")
-    reload.set_defaults(func=tomato.reload)
-
-    pipeline = subparsers.add_parser("pipeline")
-    pipparsers = pipeline.add_subparsers(dest="subsubcommand", required=True)
-
-    pip_load = pipparsers.add_parser("load")
-    pip_load.set_defaults(func=tomato.pipeline_load)
-    pip_load.add_argument("pipeline")
-    pip_load.add_argument("sampleid")
+    argv = sys.argv[1:]
+    subcommand = _sniff_subcommand(
+        argv, {"status", "start", "stop", "init", "reload", "pipeline"}
+    )
 
-    pip_eject = pipparsers.add_parser("eject")
-    pip_eject.set_defaults(func=tomato.pipeline_eject)
-    pip_eject.add_argument("pipeline")
+    parsers = []
+    if subcommand in {None, "status"}:
+        status = subparsers.add_parser("status")
+        status.set_defaults(func=tomato.status)
+        parsers.append(status)
+
+    if subcommand in {None, "start"}:
+        start = subparsers.add_parser("start")
+        start.set_defaults(func=tomato.start)
+        parsers.append(start)
+
+    if subcommand in {None, "stop"}:
+        stop = subparsers.add_parser("stop")
+        stop.set_defaults(func=tomato.stop)
+        parsers.append(stop)
+
+    if subcommand in {None, "init"}:
+        init = subparsers.add_parser("init")
+        init.set_defaults(func=tomato.init)
+        parsers.append(init)
+
+    if subcommand in {None, "reload"}:
+        reload = subparsers.add_parser("reload")
+        reload.set_defaults(func=tomato.reload)
+        parsers.append(reload)
+
+    if subcommand in {None, "pipeline"}:
+        pipeline = subparsers.add_parser("pipeline")
+        pipparsers = pipeline.add_subparsers(dest="subsubcommand", required=True)
+
+        if subcommand == "pipeline":
+            rest = argv[argv.index("pipeline") + 1 :]
+            subsubcommand = _sniff_subcommand(rest, {"load", "eject", "ready"})
+        else:
+            subsubcommand = None
+
+        if subsubcommand in {None, "load"}:
+            pip_load = pipparsers.add_parser("load")
+            pip_load.set_defaults(func=tomato.pipeline_load)
+            pip_load.add_argument("pipeline")
+            pip_load.add_argument("sampleid")
+            parsers.append(pip_load)
+
+        if subsubcommand in {None, "eject"}:
+            pip_eject = pipparsers.add_parser("eject")
+            pip_eject.set_defaults(func=tomato.pipeline_eject)
+            pip_eject.add_argument("pipeline")
+            parsers.append(pip_eject)
+
+        if subsubcommand in {None, "ready"}:
+            pip_ready = pipparsers.add_parser("ready")
+            pip_ready.set_defaults(func=tomato.pipeline_ready)
+            pip_ready.add_argument("pipeline")
+            parsers.append(pip_ready)
 
-    pip_ready = pipparsers.add_parser("ready")
-    pip_ready.set_defaults(func=tomato.pipeline_ready)
-    pip_ready.add_argument("pipeline")
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Increase verbosity of tomato daemon by one level.",
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="count",
+        default=0,
+        help="Decrease verbosity of tomato daemon by one level.",
+    )
 
-    for p in [parser, verbose]:
-        p.add_argument(
-            "--verbose",
-            "-v",
-            action="count",
-            default=0,
-            help="Increase verbosity of tomato daemon by one level.",
-        )
-        p.add_argument(
-            "--quiet",
-            "-q",
-            action="count",
-            default=0,
-            help="Decrease verbosity of tomato daemon by one level.",
-        )
-
-    for p in [start, stop, init, status, reload, pip_load, pip_eject, pip_ready]:
-        p.add_argument(
-            "--port",
-            "-p",
-            help="Port number of tomato's reply socket",
-            default=DEFAULT_TOMATO_PORT,
-        )
-        p.add_argument(
-            "--timeout",
-            help="Timeout for the tomato command, in milliseconds",
-            type=int,
-            default=3000,
-        )
-        p.add_argument(
-            "--appdir",
-            "-A",
-            help="Settings directory for tomato",
-            default=config_dir,
-        )
-        p.add_argument(
-            "--datadir",
-            "-D",
-            help="Data directory for tomato",
-            default=data_dir,
-        )
-        p.add_argument(
-            "--logdir",
-            "-L",
-            help="Log directory for tomato",
-            default=data_dir,
-        )
+    for p in parsers:
+        _add_tomato_opts(p, config_dir, data_dir)
 
     # parse subparser args
     args, extras = parser.parse_known_args()
-    # parse extras for verbose tags
-    args, extras = verbose.parse_known_args(extras, args)
+    # count any verbose tags left over in extras
+    _count_verbosity(args, extras)
 
-    verbosity = min(max((2 + args.verbose - args.quiet) * 10, 10), 50)
-    set_loglevel(verbosity)
+    args.verbosity = min(max((2 + args.verbose - args.quiet) * 10, 10), 50)
+    set_loglevel(args.verbosity)
 
-    context = zmq.Context()
     if "func" in args:
-        ret = args.func(**vars(args), context=context, verbosity=verbosity)
-        print(yaml.dump(ret.dict()))
+        ret = args.func(**vars(args), context=get_context())
+        print(_dump(ret))
 
 
 def run_ketchup():
-    dirs = appdirs.AppDirs("tomato", "dgbowl", version=VERSION)
+    from tomato import ketchup, tomato
+
+    dirs = _appdirs()
     config_dir = dirs.user_config_dir
     data_dir = dirs.user_data_dir
 
@@ -152,120 +273,111 @@ def run_ketchup():
         version=f"%(prog)s version {VERSION}",
     )
 
-    verbose = argparse.ArgumentParser(add_help=False)
-
-    for p in [parser, verbose]:
-        p.add_argument(
-            "--verbose",
-            "-v",
-            action="count",
-            default=0,
-            help="Increase verbosity by one level.",
-        )
-        p.add_argument(
-            "--quiet",
-            "-q",
-            action="count",
-            default=0,
-            help="Decrease verbosity by one level.",
-        )
-
-    subparsers = parser.add_subparsers(dest="subcommand", required=True)
-
-    submit = subparsers.add_parser("submit")
-    submit.add_argument(
-        "payload",
-        help="File containing the payload to be submitted to tomato.",
-        default=None,
-    )
-    submit.add_argument(
-        "-j",
-        "--jobname",
-        help="Set the job name of the submitted job to?",
-        default=None,
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Increase verbosity by one level.",
     )
-    submit.set_defaults(func=ketchup.submit)
-
-    status = subparsers.add_parser("status")
-    status.add_argument(
-        "jobids",
-        nargs="*",
-        help=(
-            "The jobid(s) of the requested job(s), "
-            "defaults to the status of the whole queue."
-        ),
-        type=int,
-        default=None,
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="count",
+        default=0,
+        help="Decrease verbosity by one level.",
     )
-    status.set_defaults(func=ketchup.status)
 
-    cancel = subparsers.add_parser("cancel")
-    cancel.add_argument(
-        "jobid",
-        help="The jobid of the job to be cancelled.",
-        type=int,
-        default=None,
-    )
-    cancel.set_defaults(func=ketchup.cancel)
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
 
-    snapshot = subparsers.add_parser("snapshot")
-    snapshot.add_argument(
-        "jobid", help="The jobid of the job to be snapshotted.", default=None
+    argv = sys.argv[1:]
+    subcommand = _sniff_subcommand(
+        argv, {"submit", "status", "cancel", "snapshot", "search"}
     )
-    snapshot.set_defaults(func=ketchup.snapshot)
 
-    search = subparsers.add_parser("search")
-    search.add_argument(
-        "jobname",
-        help="The jobname of the searched job.",
-        default=None,
-    )
-    search.add_argument(
-        "-c",
-        "--complete",
-        action="store_true",
-        default=False,
-        help="Search also in completed jobs.",
-    )
-    search.set_defaults(func=ketchup.search)
-
-    for p in [submit, status, cancel, snapshot, search]:
-        p.add_argument(
-            "--port",
-            "-p",
-            help="Port number of tomato's reply socket",
-            default=DEFAULT_TOMATO_PORT,
+    parsers = []
+    if subcommand in {None, "submit"}:
+        submit = subparsers.add_parser("submit")
+        submit.add_argument(
+            "payload",
+            help="File containing the payload to be submitted to tomato.",
+            default=None,
         )
-        p.add_argument(
-            "--timeout",
-            help="Timeout for the ketchup command, in milliseconds",
+        submit.add_argument(
+            "-j",
+            "--jobname",
+            help="Set the job name of the submitted job to?",
+            default=None,
+        )
+        submit.set_defaults(func=ketchup.submit)
+        parsers.append(submit)
+
+    if subcommand in {None, "status"}:
+        status = subparsers.add_parser("status")
+        status.add_argument(
+            "jobids",
+            nargs="*",
+            help=(
+                "The jobid(s) of the requested job(s), "
+                "defaults to the status of the whole queue."
+            ),
             type=int,
-            default=3000,
+            default=None,
         )
-        p.add_argument(
-            "--appdir",
-            help="Settings directory for tomato",
-            default=config_dir,
+        status.set_defaults(func=ketchup.status)
+        parsers.append(status)
+
+    if subcommand in {None, "cancel"}:
+        cancel = subparsers.add_parser("cancel")
+        cancel.add_argument(
+            "jobid",
+            help="The jobid of the job to be cancelled.",
+            type=int,
+            default=None,
         )
-        p.add_argument(
-            "--datadir",
-            help="Data directory for tomato",
-            default=data_dir,
+        cancel.set_defaults(func=ketchup.cancel)
+        parsers.append(cancel)
+
+    if subcommand in {None, "snapshot"}:
+        snapshot = subparsers.add_parser("snapshot")
+        snapshot.add_argument(
+            "jobid", help="The jobid of the job to be snapshotted.", default=None
+        )
+        snapshot.set_defaults(func=ketchup.snapshot)
+        parsers.append(snapshot)
+
+    if subcommand in {None, "search"}:
+        search = subparsers.add_parser("search")
+        search.add_argument(
+            "jobname",
+            help="The jobname of the searched job.",
+            default=None,
         )
+        search.add_argument(
+            "-c",
+            "--complete",
+            action="store_true",
+            default=False,
+            help="Search also in completed jobs.",
+        )
+        search.set_defaults(func=ketchup.search)
+        parsers.append(search)
+
+    for p in parsers:
+        _add_ketchup_opts(p, config_dir, data_dir)
 
     args, extras = parser.parse_known_args()
-    args, extras = verbose.parse_known_args(extras, args)
+    _count_verbosity(args, extras)
 
-    verbosity = args.verbose - args.quiet
-    set_loglevel(verbosity)
+    args.verbosity = args.verbose - args.quiet
+    set_loglevel(args.verbosity)
 
     if "func" in args:
-        context = zmq.Context()
-        status = tomato.status(**vars(args), context=context)
+        context = get_context()
+        kwargs = vars(args)
+        status = tomato.status(**kwargs, context=context)
         if not status.success:
-            print(yaml.dump(status.dict()))
+            print(_dump(status))
         else:
-            ret = args.func(
-                **vars(args), verbosity=verbosity, context=context, status=status
-            )
-            print(yaml.dump(ret.dict()))
+            ret = args.func(**kwargs, context=context, status=status)
+            print(_dump(ret))
@@ -146,12 +146,12 @@ def run_daemon():
     while True:
         socks = dict(poller.poll(100))
         if rep in socks:
-            msg = rep.recv_pyobj()
+            msg = rep.recv_json()
             logger.debug(f"received {msg=}")
             if "cmd" not in msg:
                 logger.error(f"received msg without cmd: {msg=}")
-                rep.send_pyobj(
-                    Reply(success=False, msg="received msg without cmd", data=msg)
+                rep.send_string(
+                    Reply(success=False, msg="received msg without cmd", data=msg).json()
                 )
                 continue
             cmd = msg["cmd"]
@@ -161,7 +161,10 @@ def run_daemon():
                 msg = Reply(success=True, msg=daemon.status)
             elif cmd == "setup":
                 settings = msg.get("settings", settings)
-                newpips = {p["name"]: Pipeline(**p) for p in msg.get("pipelines", {})}
+                newpips = {
+                    pname: Pipeline(name=pname, devices=list(pdata["devices"].values()))
+                    for pname, pdata in msg.get("pipelines", {}).items()
+                }
                 daemon.pipelines = merge_pipelines(daemon.pipelines, newpips)
                 if daemon.status == "bootstrap":
                     logger.info(
@@ -188,10 +191,33 @@ def run_daemon():
                 msg = Reply(
                     success=True, msg=daemon.status, data=daemon.pipelines[pname]
                 )
+            elif cmd == "pipeline_check_and_set":
+                pname = msg.get("pipeline")
+                op = msg.get("op")
+                params = msg.get("params", {})
+                pip = daemon.pipelines.get(pname)
+                if pip is None:
+                    msg = Reply(success=False, msg="notfound", data=daemon.pipelines)
+                elif op == "load" and pip.sampleid is not None:
+                    msg = Reply(success=False, msg="notempty", data=pip)
+                elif op == "eject" and pip.sampleid is None:
+                    msg = Reply(success=True, msg="noop", data=pip)
+                elif op == "ready" and pip.ready:
+                    msg = Reply(success=True, msg="noop", data=pip)
+                elif op in {"eject", "ready"} and pip.jobid is not None:
+                    msg = Reply(success=False, msg="running", data=pip)
+                else:
+                    for k, v in params.items():
+                        logger.info(f"setting {pname}.{k} to {v}")
+                        setattr(pip, k, v)
+                    msg = Reply(success=True, msg="ok", data=pip)
             elif cmd == "status":
                 msg = Reply(success=True, msg=daemon.status, data=daemon)
+            else:
+                logger.error(f"received msg with unknown cmd: {msg=}")
+                msg = Reply(success=False, msg=f"unknown cmd: {cmd}", data=msg)
             logger.debug(f"reply with {msg=}")
-            rep.send_pyobj(msg)
+            rep.send_string(msg.json())
 
         # Former main loop - split into job and pipeline managers
         if daemon.status == "running":
@@ -1,3 +1,4 @@
+import functools
 import os
 from typing import Union
 
@@ -281,6 +282,7 @@ def parse_raw_data(api, data, devname):
     return parsed
 
 
+@functools.lru_cache(maxsize=4)
 def get_kbio_api(dllpath):
     if c_is_64b:
         dllfile = "EClib64.dll"
@@ -292,6 +294,7 @@ def get_kbio_api(dllpath):
     return api
 
 
+@functools.lru_cache(maxsize=128)
 def get_kbio_techpath(
     dllpath,
     techname,
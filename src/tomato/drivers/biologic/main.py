@@ -1,6 +1,8 @@
+import functools
 import logging
 import multiprocessing
 import time
+from contextlib import contextmanager
 from filelock import FileLock
 
 from datetime import datetime, timezone
@@ -13,6 +15,37 @@ from .kbio_wrapper import (
 )
 
 
+@functools.lru_cache(maxsize=4)
+def _get_lib_version(dllpath: str) -> str:
+    return get_kbio_api(dllpath).GetLibVersion()
+
+
+@contextmanager
+def _locked_session(
+    api,
+    address: str,
+    channel: int,
+    lockpath: str,
+    logger: logging.Logger,
+):
+    """
+    Hold the device FileLock over a full connect - operate - disconnect
+    transaction, yielding the connection ``(id_, device_info)``.
+    """
+    with FileLock(lockpath, timeout=60):
+        try:
+            logger.debug(f"connecting to '{address}:{channel}'")
+            id_, device_info = api.Connect(address)
+            try:
+                yield id_, device_info
+            finally:
+                logger.debug(f"disconnecting from '{address}:{channel}'")
+                api.Disconnect(id_)
+        except Exception as e:
+            logger.critical(f"{e=}")
+            raise
+
+
 def get_status(
     address: str,
     channel: int,
@@ -44,33 +77,30 @@ def get_status(
 
     """
     api = get_kbio_api(dllpath)
-    metadata = {}
-    metadata["dll_version"] = api.GetLibVersion()
-    with FileLock(lockpath, timeout=60) as fh:
-        try:
-            logger.info(f"connecting to '{address}:{channel}'")
-            id_, device_info = api.Connect(address)
-            logger.info(f"getting status of '{address}:{channel}'")
-            channel_info = api.GetChannelInfo(id_, channel)
-            logger.info(f"disconnecting from '{address}:{channel}'")
-            api.Disconnect(id_)
-        except Exception as e:
-            logger.critical(f"{e=}")
-    metadata["device_model"] = device_info.model
-    metadata["device_channels"] = device_info.NumberOfChannels
-    metadata["channel_state"] = channel_info.state
-    metadata["channel_board"] = channel_info.board
-    metadata["channel_amp"] = channel_info.amplifier if channel_info.NbAmps else None
-    metadata["channel_I_ranges"] = [channel_info.min_IRange, channel_info.max_IRange]
-    if metadata["channel_state"] in {"STOP"}:
+    with _locked_session(api, address, channel, lockpath, logger) as (
+        id_,
+        device_info,
+    ):
+        logger.debug(f"getting status of '{address}:{channel}'")
+        channel_info = api.GetChannelInfo(id_, channel)
+    metadata = {
+        "dll_version": _get_lib_version(dllpath),
+        "device_model": device_info.model,
+        "device_channels": device_info.NumberOfChannels,
+        "channel_state": channel_info.state,
+        "channel_board": channel_info.board,
+        "channel_amp": channel_info.amplifier if channel_info.NbAmps else None,
+        "channel_I_ranges": [channel_info.min_IRange, channel_info.max_IRange],
+    }
+    state = metadata["channel_state"]
+    if state == "STOP":
         ready = True
-    elif metadata["channel_state"] in {"RUN"}:
+    elif state == "RUN":
         ready = False
     else:
-        logger.critical("channel state not understood: '%s'", metadata["channel_state"])
+        logger.critical("channel state not understood: '%s'", state)
         raise ValueError("channel state not understood")
-    dt = datetime.now(timezone.utc)
-    return dt.timestamp(), ready, metadata
+    return time.time(), ready, metadata
 
 
 def get_data(
@@ -103,19 +133,15 @@ def get_data(
 
     """
     api = get_kbio_api(dllpath)
-    with FileLock(lockpath, timeout=60) as fh:
-        try:
-            logger.info(f"connecting to '{address}:{channel}'")
-            id_, device_info = api.Connect(address)
-            logger.info(f"getting data from '{address}:{channel}'")
-            data = api.GetData(id_, channel)
-            logger.info(f"disconnecting from '{address}:{channel}'")
-            api.Disconnect(id_)
-        except Exception as e:
-            logger.critical(f"{e=}")
-    dt = datetime.now(timezone.utc)
+    with _locked_session(api, address, channel, lockpath, logger) as (
+        id_,
+        device_info,
+    ):
+        logger.debug(f"getting data from '{address}:{channel}'")
+        data = api.GetData(id_, channel)
+    ts = time.time()
     data = parse_raw_data(api, data, device_info.model)
-    return dt.timestamp(), data["technique"]["data_rows"], data
+    return ts, data["technique"]["data_rows"], data
 
 
 def start_job(
@@ -166,32 +192,25 @@ def start_job(
     logger.debug("translating payload to ECC")
     eccpars = payload_to_ecc(api, payload, capacity)
     ntechs = len(eccpars)
-    with FileLock(lockpath, timeout=60) as fh:
-        try:
-            first = True
-            last = False
-            ti = 1
-            logger.info(f"connecting to '{address}:{channel}'")
-            id_, device_info = api.Connect(address)
-            for techname, pars in eccpars:
-                if ti == ntechs:
-                    last = True
-                techfile = get_kbio_techpath(dllpath, techname, device_info.model)
-                logger.info(f"loading technique {ti}: '{techname}'")
-                api.LoadTechnique(
-                    id_, channel, techfile, pars, first=first, last=last, display=False
-                )
-                ti += 1
-                first = False
-            logger.info(f"starting run on '{address}:{channel}'")
-            api.StartChannel(id_, channel)
-            logger.info(f"disconnecting from '{address}:{channel}'")
-            api.Disconnect(id_)
-        except Exception as e:
-            logger.critical(f"{e=}")
-    dt = datetime.now(timezone.utc)
-    logger.info(f"run started at '{dt}'")
-    return dt.timestamp()
+    techs = [
+        (techname, pars, ti == 0, ti == ntechs - 1)
+        for ti, (techname, pars) in enumerate(eccpars)
+    ]
+    with _locked_session(api, address, channel, lockpath, logger) as (
+        id_,
+        device_info,
+    ):
+        for ti, (techname, pars, first, last) in enumerate(techs, start=1):
+            techfile = get_kbio_techpath(dllpath, techname, device_info.model)
+            logger.info(f"loading technique {ti}: '{techname}'")
+            api.LoadTechnique(
+                id_, channel, techfile, pars, first=first, last=last, display=False
+            )
+        logger.info(f"starting run on '{address}:{channel}'")
+        api.StartChannel(id_, channel)
+    ts = time.time()
+    logger.info(f"run started at '{datetime.fromtimestamp(ts, tz=timezone.utc)}'")
+    return ts
 
 
 def stop_job(
@@ -227,19 +246,14 @@ def stop_job(
 
     """
     api = get_kbio_api(dllpath)
-    with FileLock(lockpath, timeout=60) as fh:
-        try:
-            logger.info(f"connecting to '{address}:{channel}'")
-            id_, device_info = api.Connect(address)
-            logger.info(f"stopping run on '{address}:{channel}'")
-            api.StopChannel(id_, channel)
-            logger.info(f"run stopped at '{dt}'")
-            api.Disconnect(id_)
-        except Exception as e:
-            logger.critical(f"{e=}")
+    with _locked_session(api, address, channel, lockpath, logger) as (
+        id_,
+        device_info,
+    ):
+        logger.info(f"stopping run on '{address}:{channel}'")
+        api.StopChannel(id_, channel)
+        ts = time.time()
+        logger.info(f"run stopped at '{datetime.fromtimestamp(ts, tz=timezone.utc)}'")
     if jobqueue:
         jobqueue.close()
-    else:
-        pass
-    dt = datetime.now(timezone.utc)
-    return dt.timestamp()
+    return ts
@@ -74,10 +74,10 @@ def tomato_job() -> None:
     context = zmq.Context()
     req = context.socket(zmq.REQ)
     req.connect(f"tcp://127.0.0.1:{args.port}")
-    req.send_pyobj(
+    req.send_json(
         dict(cmd="pipeline", pipeline=pip, params=dict(jobid=jobid, pid=pid))
     )
-    msg = req.recv_pyobj()
+    msg = req.recv_json()
     dbhandler.job_set_status(queue["path"], "r", jobid, type=queue["type"])
     dbhandler.job_set_time(queue["path"], "executed_at", jobid, type=queue["type"])
 
@@ -118,12 +118,12 @@ def tomato_job() -> None:
         logger.info("==============================")
         ready = False
 
-    req.send_pyobj(
+    req.send_json(
         dict(
             cmd="pipeline", pipeline=pip, params=dict(jobid=None, pid=None, ready=ready)
         )
     )
-    msg = req.recv_pyobj()
+    msg = req.recv_json()
     dbhandler.job_set_time(queue["path"], "completed_at", jobid, type=queue["type"])
 
 
@@ -3,8 +3,6 @@ import random
 import time
 import multiprocessing
 
-from datetime import datetime, timezone
-
 
 def _dummy_process(
     queue: multiprocessing.Queue,
@@ -66,13 +64,13 @@ def get_status(
 
     """
     logger.debug("in 'dummy.get_status'")
-    dt = datetime.now(timezone.utc)
+    ts = time.time()
     metadata = {"address": address, "channel": channel}
     if jobqueue:
         ready = jobqueue.empty()
     else:  # this happens when called by driver_reset
         ready = True
-    return dt.timestamp(), ready, metadata
+    return ts, ready, metadata
 
 
 def get_data(
@@ -105,7 +103,7 @@ def get_data(
     logger.debug(
         f"in 'dummy.get_data', jobqueue is{'' if jobqueue.empty() else ' not'} empty"
     )
-    dt = datetime.now(timezone.utc)
+    ts = time.time()
     points = []
     while not jobqueue.empty():
         v = jobqueue.get()
@@ -115,7 +113,7 @@ def get_data(
         jobqueue.put(None)
     npoints = len(points)
     data = {"data": points, "current": None}
-    return dt.timestamp(), npoints, data
+    return ts, npoints, data
 
 
 def start_job(
@@ -152,7 +150,7 @@ def start_job(
         A timestamp corresponding to the start of the job execution.
 
     """
-    dt = datetime.now(timezone.utc)
+    ts = time.time()
     logger.info("in 'dummy.start_job'")
     logger.debug(f"{payload=}")
     for ip, p in enumerate(payload):
@@ -168,7 +166,7 @@ def start_job(
         pr.start()
     # Delay before quitting so that processes get a chance to start
     time.sleep(1)
-    return dt.timestamp()
+    return ts
 
 
 def stop_job(
@@ -205,5 +203,4 @@ def stop_job(
         jobqueue.close()
     else:
         pass
-    dt = datetime.now(timezone.utc)
-    return dt.timestamp()
+    return time.time()
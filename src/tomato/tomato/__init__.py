@@ -19,82 +19,190 @@ Also includes the following *pipeline* management functions:
 - :func:`pipeline_ready` to mark a pipeline as ready
 
 """
+from __future__ import annotations
+
 import os
 import subprocess
 import textwrap
 import json
-import copy
+import logging
 from pathlib import Path
 from datetime import datetime, timezone
 from importlib import metadata
-
-import argparse
-import logging
-import psutil
-import zmq
-import appdirs
-import yaml
-import toml
+from typing import TYPE_CHECKING
 
 from tomato import dbhandler, ketchup
-from tomato.models import Reply, Pipeline
+
+if TYPE_CHECKING:
+    import zmq
+from tomato.models import Reply, Pipeline, Daemon
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_TOMATO_PORT = 1234
 VERSION = metadata.version("tomato")
 
+_config_cache = {}
+_default_devices = None
+
+
+def _read_default_devices() -> dict:
+    """
+    Return the packaged fallback device settings, parsed once per process.
+    """
+    global _default_devices
+    if _default_devices is None:
+        from importlib.resources import files
+
+        _default_devices = json.loads(
+            (files("tomato") / "data" / "default_devices.json").read_text()
+        )
+    return _default_devices
+
+
+def _read_cached(path, parse):
+    """
+    Parse a config file via ``parse``, caching the result keyed on the file's
+    mtime and size so that unchanged files are not re-parsed on every call.
+    """
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    data = parse(path)
+    _config_cache[str(path)] = (stamp, data)
+    return data
+
+
+def _parse_devices(path) -> dict:
+    import yaml
+
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+
+    with open(path, "r") as infile:
+        return yaml.load(infile, Loader=YamlLoader)
+
+
+def _parse_settings(path) -> dict:
+    try:
+        import tomllib
+    except ImportError:
+        import tomli as tomllib
+
+    with open(path, "rb") as inf:
+        return tomllib.load(inf)
+
+
+_req_sockets = {}
+
+
+def _get_req_socket(context: zmq.Context, port: int) -> zmq.Socket:
+    """
+    Return a connected REQ socket for ``port``, reused across calls within
+    one context so that repeated commands skip connection setup.
+    """
+    import zmq
+
+    key = (id(context), port)
+    req = _req_sockets.get(key)
+    if req is None or req.closed:
+        req = context.socket(zmq.REQ)
+        req.setsockopt(zmq.LINGER, 0)
+        req.connect(f"tcp://127.0.0.1:{port}")
+        _req_sockets[key] = req
+    return req
+
+
+def _drop_req_socket(context: zmq.Context, port: int):
+    """
+    Close and forget the cached REQ socket for ``port``. Required after a
+    timed-out request, as the REQ state machine cannot be reused then.
+    """
+    req = _req_sockets.pop((id(context), port), None)
+    if req is not None and not req.closed:
+        req.close()
+
+
+def _pipeline_check_and_set(
+    *,
+    port: int,
+    timeout: int,
+    context: zmq.Context,
+    pipeline: str,
+    op: str,
+    params: dict,
+) -> Reply:
+    """
+    Issue a single ``pipeline_check_and_set`` request, which validates the
+    state of ``pipeline`` and applies ``params`` on the daemon in one
+    round-trip. The reply ``msg`` carries the daemon's verdict.
+    """
+    import zmq
+
+    req = _get_req_socket(context, port)
+    req.setsockopt(zmq.RCVTIMEO, timeout)
+    req.send_json(
+        dict(cmd="pipeline_check_and_set", pipeline=pipeline, op=op, params=params)
+    )
+    try:
+        return Reply(**req.recv_json())
+    except zmq.Again:
+        _drop_req_socket(context, port)
+        return Reply(success=False, msg=f"tomato not running on port {port}")
+
+
+_loghandler = None
+
 
 def set_loglevel(delta: int):
+    global _loghandler
     loglevel = min(max(30 - (10 * delta), 10), 50)
-    logging.basicConfig(level=loglevel)
-    logger.debug("loglevel set to '%s'", logging._levelToName[loglevel])
+    if _loghandler is None:
+        _loghandler = logging.StreamHandler()
+        logging.root.addHandler(_loghandler)
+    logging.root.setLevel(loglevel)
+    logger.debug("loglevel set to '%s'", logging.getLevelName(loglevel))
 
 
 def get_pipelines(yamlpath: str) -> dict:
     logger.debug(f"loading pipeline settings from '{yamlpath}'")
     try:
-        with open(yamlpath, "r") as infile:
-            jsdata = yaml.safe_load(infile)
+        jsdata = _read_cached(yamlpath, _parse_devices)
     except FileNotFoundError:
         logger.error(f"device settings not found. Running with default devices.")
-        devpath = Path(__file__).parent / ".." / "data" / "default_devices.json"
-        with devpath.open() as inp:
-            jsdata = json.load(inp)
+        jsdata = _read_default_devices()
     devices = jsdata["devices"]
     pipelines = jsdata["pipelines"]
-    ret = []
+    dev_by_name = {dev["name"]: dev for dev in devices}
+    ret = {}
     for pip in pipelines:
         if "*" in pip["name"]:
-            data = {"name": pip["name"], "devices": []}
             assert len(pip["devices"]) == 1
-            for ppars in pip["devices"]:
-                for dpars in devices:
-                    if dpars["name"] == ppars["name"]:
-                        break
-                dev = {k: v for k, v in dpars.items() if k != "channels"}
-                dev["tag"] = ppars["tag"]
-                data["devices"].append(dev)
-                for ch in dpars["channels"]:
-                    d = copy.deepcopy(data)
-                    d["devices"][0]["channel"] = ch
-                    d["name"] = d["name"].replace("*", f"{ch}")
-                    ret.append(d)
+            dpars = dev_by_name[pip["devices"][0]["name"]]
+            names_and_channels = [
+                (pip["name"].replace("*", f"{ch}"), ch) for ch in dpars["channels"]
+            ]
         else:
-            data = {"name": pip["name"], "devices": []}
+            names_and_channels = [(pip["name"], None)]
+        for pname, ch in names_and_channels:
+            devs = {}
             for ppars in pip["devices"]:
-                for dpars in devices:
-                    if dpars["name"] == ppars["name"]:
-                        break
+                dpars = dev_by_name[ppars["name"]]
                 dev = {k: v for k, v in dpars.items() if k != "channels"}
                 dev["tag"] = ppars["tag"]
-                if isinstance(ppars.get("channel"), int):
+                if ch is not None:
+                    dev["channel"] = ch
+                elif isinstance(ppars.get("channel"), int):
                     assert ppars["channel"] in dpars["channels"]
                     dev["channel"] = ppars["channel"]
                 else:
                     assert "*" in pip["name"]
-                data["devices"].append(dev)
-            ret.append(data)
+                devs[dev["name"]] = dev
+            ret[pname] = {"devices": devs}
     return ret
 
 
@@ -105,28 +213,25 @@ def status(
     context: zmq.Context,
     **_: dict,
 ) -> Reply:
+    import zmq
+
     logger.debug(f"checking status of tomato on port {port}")
-    req = context.socket(zmq.REQ)
-    req.connect(f"tcp://127.0.0.1:{port}")
-    req.send_pyobj(dict(cmd="status"))
-
-    poller = zmq.Poller()
-    poller.register(req, zmq.POLLIN)
-    events = dict(poller.poll(timeout))
-    if req in events:
-        rep = req.recv_pyobj()
-        return Reply(
-            success=True,
-            msg=f"tomato running on port {port}",
-            data=rep.data,
-        )
-    else:
-        req.setsockopt(zmq.LINGER, 0)
-        req.close()
+    req = _get_req_socket(context, port)
+    req.setsockopt(zmq.RCVTIMEO, timeout)
+    req.send_json(dict(cmd="status"))
+    try:
+        rep = Reply(**req.recv_json())
+    except zmq.Again:
+        _drop_req_socket(context, port)
         return Reply(
             success=False,
             msg=f"tomato not running on port {port}",
         )
+    return Reply(
+        success=True,
+        msg=f"tomato running on port {port}",
+        data=Daemon(**rep.data),
+    )
 
 
 def start(
@@ -139,16 +244,21 @@ def start(
     logdir: str,
     **kwargs: dict,
 ) -> Reply:
+    import psutil
+    import socket
+
     logging.debug(f"checking for availability of port {port}.")
+    probe = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     try:
-        rep = context.socket(zmq.REP)
-        rep.bind(f"tcp://127.0.0.1:{port}")
-        rep.unbind(f"tcp://127.0.0.1:{port}")
-    except zmq.error.ZMQError:
+        probe.bind(("127.0.0.1", int(port)))
+    except OSError:
         return Reply(
             success=False,
             msg=f"required port {port} is already in use, choose a different one",
         )
+    finally:
+        probe.close()
 
     logger.debug(f"starting tomato on port {port}")
     cmd = [
@@ -180,12 +290,20 @@ def start(
 
 
 def stop(*, port: int, timeout: int, context: zmq.Context, **_: dict) -> Reply:
+    import zmq
+
     stat = status(port=port, timeout=timeout, context=context)
     if stat.success:
-        req = context.socket(zmq.REQ)
-        req.connect(f"tcp://127.0.0.1:{port}")
-        req.send_pyobj(dict(cmd="stop"))
-        rep = req.recv_pyobj()
+        req = _get_req_socket(context, port)
+        req.send_json(dict(cmd="stop"))
+        try:
+            rep = Reply(**req.recv_json())
+        except zmq.Again:
+            _drop_req_socket(context, port)
+            return Reply(
+                success=False,
+                msg=f"tomato on port {port} did not reply to the stop command",
+            )
         if rep.msg == "stop":
             return Reply(
                 success=True,
@@ -225,23 +343,24 @@ def init(
         [drivers]
         """
     )
-    if not adir.exists():
-        logging.debug("creating directory '%s'", adir)
-        os.makedirs(adir)
-    with open(adir / "settings.toml", "w", encoding="utf-8") as of:
-        of.write(defaults)
+    settings_path = adir / "settings.toml"
+    os.makedirs(adir, exist_ok=True)
+    settings_path.write_text(defaults, encoding="utf-8")
     return Reply(
         success=True,
-        msg=f"wrote default settings into {Path(appdir) / 'settings.toml'}",
+        msg=f"wrote default settings into {settings_path}",
     )
 
 
 def reload(
     *, port: int, timeout: int, context: zmq.Context, appdir: str, **_: dict
 ) -> Reply:
+    import zmq
+
     logging.debug("Loading settings.toml file from %s.", appdir)
+    settings_path = Path(appdir) / "settings.toml"
     try:
-        settings = toml.load(Path(appdir) / "settings.toml")
+        settings = _read_cached(settings_path, _parse_settings)
     except FileNotFoundError:
         return Reply(
             success=False,
@@ -256,15 +375,21 @@ def reload(
     stat = status(port=port, timeout=timeout, context=context)
     if not stat.success:
         return stat
-    req = context.socket(zmq.REQ)
-    req.connect(f"tcp://127.0.0.1:{port}")
-    req.send_pyobj(dict(cmd="setup", settings=settings, pipelines=pipelines))
-    rep = req.recv_pyobj()
+    req = _get_req_socket(context, port)
+    req.send_json(dict(cmd="setup", settings=settings, pipelines=pipelines))
+    try:
+        rep = Reply(**req.recv_json())
+    except zmq.Again:
+        _drop_req_socket(context, port)
+        return Reply(
+            success=False,
+            msg=f"tomato configuration on port {port} failed: no reply received",
+        )
     if rep.msg == "running":
         return Reply(
             success=True,
             msg=f"tomato configured on port {port} with settings from {appdir}",
-            data=rep.data,
+            data=Daemon(**rep.data),
         )
     else:
         return Reply(
@@ -292,26 +417,30 @@ def pipeline_load(
         tomato pipeline load <samplename> <pipeline>
 
     """
-    stat = status(port=port, timeout=timeout, context=context)
-    if not stat.success:
-        return stat
-
-    if pipeline not in stat.data.pipelines:
+    rep = _pipeline_check_and_set(
+        port=port,
+        timeout=timeout,
+        context=context,
+        pipeline=pipeline,
+        op="load",
+        params=dict(sampleid=sampleid),
+    )
+    if rep.msg == "notfound":
         return Reply(success=False, msg=f"pipeline {pipeline} not found on tomato")
-    pip = stat.data.pipelines[pipeline]
-
-    if pip.sampleid is not None:
+    elif rep.msg == "notempty":
         return Reply(
-            success=False, msg=f"pipeline {pipeline} is not empty, aborting", data=pip
+            success=False,
+            msg=f"pipeline {pipeline} is not empty, aborting",
+            data=Pipeline(**rep.data),
         )
-
-    req = context.socket(zmq.REQ)
-    req.connect(f"tcp://127.0.0.1:{port}")
-    req.send_pyobj(
-        dict(cmd="pipeline", pipeline=pipeline, params=dict(sampleid=sampleid))
-    )
-    msg = req.recv_pyobj()
-    return Reply(success=True, msg=f"loaded {sampleid} into {pipeline}", data=msg.data)
+    elif rep.msg == "ok":
+        return Reply(
+            success=True,
+            msg=f"loaded {sampleid} into {pipeline}",
+            data=Pipeline(**rep.data),
+        )
+    else:
+        return rep
 
 
 def pipeline_eject(
@@ -331,37 +460,40 @@ def pipeline_eject(
         tomato pipeline eject <pipeline>
 
     """
-    stat = status(port=port, timeout=timeout, context=context)
-    if not stat.success:
-        return stat
-
-    if pipeline not in stat.data.pipelines:
+    rep = _pipeline_check_and_set(
+        port=port,
+        timeout=timeout,
+        context=context,
+        pipeline=pipeline,
+        op="eject",
+        params=dict(sampleid=None, ready=False),
+    )
+    if rep.msg == "notfound":
         return Reply(
             success=False,
             msg=f"pipeline {pipeline} not found on tomato",
-            data=stat.data.pipelines,
+            data={k: Pipeline(**v) for k, v in rep.data.items()},
         )
-    pip = stat.data.pipelines[pipeline]
-
-    if pip.sampleid is None:
+    elif rep.msg == "noop":
         return Reply(
-            success=True, msg=f"pipeline {pipeline} was already empty", data=pip
+            success=True,
+            msg=f"pipeline {pipeline} was already empty",
+            data=Pipeline(**rep.data),
         )
-
-    if pip.jobid is not None:
+    elif rep.msg == "running":
         return Reply(
-            success=False, msg="cannot eject from a running pipeline", data=pip
+            success=False,
+            msg="cannot eject from a running pipeline",
+            data=Pipeline(**rep.data),
         )
-
-    req = context.socket(zmq.REQ)
-    req.connect(f"tcp://127.0.0.1:{port}")
-    req.send_pyobj(
-        dict(cmd="pipeline", pipeline=pipeline, params=dict(sampleid=None, ready=False))
-    )
-    rep = req.recv_pyobj()
-    return Reply(
-        success=True, msg=f"pipeline {pipeline} ejected succesffully", data=rep.data
-    )
+    elif rep.msg == "ok":
+        return Reply(
+            success=True,
+            msg=f"pipeline {pipeline} ejected succesffully",
+            data=Pipeline(**rep.data),
+        )
+    else:
+        return rep
 
 
 def pipeline_ready(
@@ -381,30 +513,37 @@ def pipeline_ready(
         pipeline ready <pipeline>
 
     """
-    stat = status(port=port, timeout=timeout, context=context)
-    if not stat.success:
-        return stat
-
-    if pipeline not in stat.data.pipelines:
+    rep = _pipeline_check_and_set(
+        port=port,
+        timeout=timeout,
+        context=context,
+        pipeline=pipeline,
+        op="ready",
+        params=dict(ready=True),
+    )
+    if rep.msg == "notfound":
         return Reply(
             success=False,
             msg=f"pipeline {pipeline} not found on tomato",
-            data=stat.data.pipelines,
+            data={k: Pipeline(**v) for k, v in rep.data.items()},
         )
-    pip = stat.data.pipelines[pipeline]
-
-    if pip.ready:
+    elif rep.msg == "noop":
         return Reply(
-            success=True, msg=f"pipeline {pipeline} was already ready", data=pip
+            success=True,
+            msg=f"pipeline {pipeline} was already ready",
+            data=Pipeline(**rep.data),
         )
-
-    if pip.jobid is not None:
+    elif rep.msg == "running":
         return Reply(
-            success=False, msg="cannot mark a running pipeline as ready", data=pip
+            success=False,
+            msg="cannot mark a running pipeline as ready",
+            data=Pipeline(**rep.data),
         )
-
-    req = context.socket(zmq.REQ)
-    req.connect(f"tcp://127.0.0.1:{port}")
-    req.send_pyobj(dict(cmd="pipeline", pipeline=pipeline, params=dict(ready=True)))
-    rep = req.recv_pyobj()
-    return Reply(success=True, msg=f"pipeline {pipeline} set as ready", data=rep.data)
+    elif rep.msg == "ok":
+        return Reply(
+            success=True,
+            msg=f"pipeline {pipeline} set as ready",
+            data=Pipeline(**rep.data),
+        )
+    else:
+        return rep
@@ -202,8 +202,8 @@ def test_tomato_nocmd(tomato_daemon, stop_tomato_daemon):
     context = zmq.Context()
     req = context.socket(zmq.REQ)
     req.connect(f"tcp://127.0.0.1:12345")
-    req.send_pyobj(dict(cdm="typo"))
-    rep = req.recv_pyobj()
+    req.send_json(dict(cdm="typo"))
+    rep = Reply(**req.recv_json())
     print(f"{rep=}")
     assert rep.success is False
     assert "msg without cmd" in rep.msg